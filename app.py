@@ -1,25 +1,94 @@
-from flask import Flask, request, jsonify
+from functools import lru_cache
+
+import orjson
+from flask import Flask, current_app, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from collapse_poetics import CollapsePoeticsInterpreter, generate_poetics_from_invariants
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson; responses are built from bytes directly."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # same calling convention as jsonify(): one value, several positional
+        # values (serialized as a list), or keyword arguments (as an object)
+        if args and kwargs:
+            raise TypeError("response() takes either positional or keyword arguments, not both")
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = list(args) if args else (kwargs or None)
+        return current_app.response_class(orjson.dumps(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+@lru_cache(maxsize=4096)
+def _interpret(phrase_lower: str) -> tuple[str, ...]:
+    """Cached interpretation keyed on the lowercased phrase."""
+    return tuple(CollapsePoeticsInterpreter(phrase_lower).interpret())
+
+def _invariants(data):
+    """(omega, C, tau_R, kappa) from a /generate-style JSON object or a 4-element list."""
+    if isinstance(data, dict):
+        values = (data.get('omega', 0), data.get('curvature', 0),
+                  data.get('tauR', 0), data.get('kappa', 0))
+    elif isinstance(data, (list, tuple)) and len(data) == 4:
+        values = data
+    else:
+        raise ValueError("invariants must be an object or a list [omega, curvature, tauR, kappa]")
+    return tuple(float(v) for v in values)
+
 @app.route('/interpret', methods=['POST'])
 def interpret():
     phrase = request.json.get('phrase', '')
-    interpreter = CollapsePoeticsInterpreter(phrase)
-    return jsonify({"interpretation": interpreter.interpret()})
+    return {"interpretation": list(_interpret(phrase.lower()))}
+
+@app.route('/interpret_batch', methods=['POST'])
+def interpret_batch():
+    data = request.json
+    if not isinstance(data, dict):
+        return {"error": "request body must be a JSON object"}, 400
+    phrases = data.get('phrases', [])
+    if not isinstance(phrases, list) or not all(isinstance(p, str) for p in phrases):
+        return {"error": "phrases must be a list of strings"}, 400
+    return {"interpretations": [list(_interpret(p.lower())) for p in phrases]}
 
 @app.route('/generate', methods=['POST'])
 def generate():
     data = request.json
-    omega = float(data.get('omega', 0))
-    curvature = float(data.get('curvature', 0))
-    tau_R = float(data.get('tauR', 0))
-    kappa = float(data.get('kappa', 0))
-    result = generate_poetics_from_invariants(omega, curvature, tau_R, kappa)
-    return jsonify({"poetic_fragment": result})
+    if not isinstance(data, dict):
+        return {"error": "request body must be a JSON object"}, 400
+    try:
+        invariants = _invariants(data)
+    except (TypeError, ValueError) as exc:
+        return {"error": f"invalid invariants: {exc}"}, 400
+    return {"poetic_fragment": generate_poetics_from_invariants(*invariants)}
+
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch():
+    data = request.json
+    if not isinstance(data, dict):
+        return {"error": "request body must be a JSON object"}, 400
+    items = data.get('invariants', [])
+    if not isinstance(items, list):
+        return {"error": "invariants must be a list"}, 400
+    try:
+        invariants = [_invariants(d) for d in items]
+    except (TypeError, ValueError) as exc:
+        return {"error": f"invalid invariants: {exc}"}, 400
+    return {"poetic_fragments": [generate_poetics_from_invariants(*inv) for inv in invariants]}
 
 if __name__ == '__main__':
     app.run(debug=True)
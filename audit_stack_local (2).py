@@ -3,9 +3,12 @@
 import math
 import json
 import os
+import tempfile
+
+import orjson
 
 TOL = 0.005
-LEDGER_FILE = "ledger.json"
+LEDGER_FILE = "ledger.jsonl"
 
 
 def weld_pass(delta_kappa, I_ratio, residual, tol=TOL):
@@ -34,17 +37,56 @@ def render_hud(weld_id, delta_kappa, I_ratio, residual, kappa, I, seed, sha256,
     }
 
 
-def append_to_ledger(entry, filename=LEDGER_FILE):
-    if os.path.exists(filename):
-        with open(filename, "r") as f:
-            data = json.load(f)
-    else:
-        data = []
+def _dumps_line(entry):
+    # orjson is the only writer, so NaN/Infinity are always stored as null and
+    # out-of-range integers always raise, whatever else is installed
+    return orjson.dumps(entry) + b"\n"
+
+
+def _check_jsonl(filename):
+    # appending a JSON line to a legacy JSON-array ledger would corrupt it
+    if filename.endswith(".json"):
+        raise ValueError(f"{filename!r} is a JSON-array ledger; pass the .jsonl ledger "
+                         f"(the legacy file is migrated into it automatically)")
+
+
+def _migrate_legacy_ledger(filename):
+    # One-time conversion of a pre-JSONL ledger (ledger.json, a JSON array) so its
+    # records are not orphaned; the old file is left in place untouched.
+    legacy = os.path.splitext(filename)[0] + ".json"
+    if os.path.exists(filename) or not os.path.exists(legacy):
+        return
+    with open(legacy, "r") as f:
+        records = json.load(f)
+    # serialize everything before touching the filesystem, then swap the file in
+    # atomically: a failure leaves no ledger.jsonl and the migration is retried
+    payload = b"".join(_dumps_line(r) for r in records)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
-    data.append(entry)
 
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=2)
+def append_to_ledger(entry, filename=LEDGER_FILE):
+    # JSON Lines: one record per line, appended without re-reading the ledger
+    _check_jsonl(filename)
+    _migrate_legacy_ledger(filename)
+    line = _dumps_line(entry)
+    with open(filename, "ab") as f:
+        f.write(line)
+
+
+def read_ledger(filename=LEDGER_FILE):
+    _check_jsonl(filename)
+    _migrate_legacy_ledger(filename)
+    if not os.path.exists(filename):
+        return []
+    with open(filename, "rb") as f:
+        return [orjson.loads(line) for line in f if line.strip()]
 
 
 if __name__ == "__main__":
@@ -1,35 +1,59 @@
+import operator
+
+import ahocorasick
+
+# Keyword -> interpretation, in the order interpretations are reported.
+_PAIRS = (
+    ("doorway", "Doorway → anchor point in κ-space"),
+    ("edge of a room", "Edge of room → not a boundary, but a reference rejection"),
+    ("act of stepping", "Act of stepping → drift initiation (ω > 0)"),
+    ("threshold", "Threshold → curvature fold, not scalar crossing"),
+    ("fold in time", "Fold in time → τR > 0 (return delay)"),
+    ("mirror", "Mirror → κ-preserving reflection"),
+    ("spiral", "Spiral → C > 0 (high curvature path)"),
+    ("wall", "Wall → ω → 1⁻ (saturation boundary)"),
+)
+
+# Single-pass matcher over all keywords; values carry the report order.
+AUTOMATON = ahocorasick.Automaton()
+for _order, (_kw, _msg) in enumerate(_PAIRS):
+    AUTOMATON.add_word(_kw, (_order, _msg))
+AUTOMATON.make_automaton()
+
+
 class CollapsePoeticsInterpreter:
     def __init__(self, phrase):
         self.phrase = phrase.lower()
 
     def interpret(self):
-        interpretations = []
-        if "doorway" in self.phrase:
-            interpretations.append("Doorway → anchor point in κ-space")
-        if "edge of a room" in self.phrase:
-            interpretations.append("Edge of room → not a boundary, but a reference rejection")
-        if "act of stepping" in self.phrase:
-            interpretations.append("Act of stepping → drift initiation (ω > 0)")
-        if "threshold" in self.phrase:
-            interpretations.append("Threshold → curvature fold, not scalar crossing")
-        if "fold in time" in self.phrase:
-            interpretations.append("Fold in time → τR > 0 (return delay)")
-        if "mirror" in self.phrase:
-            interpretations.append("Mirror → κ-preserving reflection")
-        if "spiral" in self.phrase:
-            interpretations.append("Spiral → C > 0 (high curvature path)")
-        if "wall" in self.phrase:
-            interpretations.append("Wall → ω → 1⁻ (saturation boundary)")
-        return interpretations
+        matched = {value for _, value in AUTOMATON.iter(self.phrase)}
+        return [msg for _, msg in sorted(matched)]
+
+# Invariant rules, in argument order: (comparison, threshold, line if true, line if false).
+_RULES = (
+    (operator.gt, 0.3, "The ground slipped — a drift unbound.", "It moved, but softly — a whisper of change."),
+    (operator.gt, 0.2, "A spiral deepened — pattern without peace.", "It curled gently, holding form."),
+    (operator.gt, 5, "No way back was found — time folded.", "The loop closed — return was near."),
+    (operator.lt, 0, "Integrity broke — the weld failed.", "It held. It lived as one."),
+)
 
 def generate_poetics_from_invariants(omega=None, C=None, tau_R=None, kappa=None):
-    lines = []
-    if omega is not None:
-        lines.append("The ground slipped — a drift unbound." if omega > 0.3 else "It moved, but softly — a whisper of change.")
-    if C is not None:
-        lines.append("A spiral deepened — pattern without peace." if C > 0.2 else "It curled gently, holding form.")
-    if tau_R is not None:
-        lines.append("No way back was found — time folded." if tau_R > 5 else "The loop closed — return was near.")
-    if kappa is not None:
-        lines.append("Integrity broke — the weld failed." if kappa < 0 else "It held. It lived as one.")
-    return lines
+    return [hit if cmp(v, thr) else miss
+            for (cmp, thr, hit, miss), v in zip(_RULES, (omega, C, tau_R, kappa))
+            if v is not None]
+
+def generate_poetics_batch(omega=None, C=None, tau_R=None, kappa=None):
+    """Array form of generate_poetics_from_invariants: one list of lines per element.
+
+    Scalars and arrays are broadcast together (at least 1-d); incompatible shapes
+    raise ValueError. Rows follow the flattened broadcast shape.
+    """
+    import numpy as np
+
+    present = [(rule, v) for rule, v in zip(_RULES, (omega, C, tau_R, kappa)) if v is not None]
+    if not present:
+        return []
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for _, v in present))
+    columns = [np.where(cmp(a, thr), hit, miss).ravel().tolist()
+               for (cmp, thr, hit, miss), a in zip((rule for rule, _ in present), arrays)]
+    return [[col[i] for col in columns] for i in range(arrays[0].size)]
@@ -5,9 +5,18 @@
 # Seeded for reproducibility.
 
 import numpy as np
+import math
 from math import pi
 import matplotlib.pyplot as plt
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 RNG = np.random.default_rng(417)
 
 def formation_envelope(S, sigma=1.0, S_opt=4.0):
@@ -23,22 +32,134 @@ def bouc_wen(xdot, z, A=1.0, beta=0.6, gamma=0.2, n=2):
     """Bouc–Wen hysteresis evolution: dz/dt."""
     # sign-preserving |z|^{n-1} z == |z|^n * sign(z)
     absz = np.abs(z)
+    if n == 2:
+        return A*xdot - beta*np.abs(xdot)*absz*z - gamma*xdot*absz*absz
     return A*xdot - beta*np.abs(xdot)*(absz**(n-1))*z - gamma*xdot*(absz**n)
 
+@njit(fastmath=True, cache=True)
+def _diaphragm_kinematics(phase, x_amp, omega):
+    """x = x_amp sin(phase), xdot = omega x_amp cos(phase) in one pass over phase."""
+    x = np.empty_like(phase)
+    xdot = np.empty_like(phase)
+    v_amp = omega*x_amp
+    for i in range(phase.size):
+        # one pass over phase for both traces; sin and cos remain separate
+        # (vectorized) calls, the gain is skipping a second NumPy sweep + temporary
+        ph = phase[i]
+        x[i] = x_amp*math.sin(ph)
+        xdot[i] = v_amp*math.cos(ph)
+    return x, xdot
+
+@njit(fastmath=True, cache=True)
+def _integrate_boucwen_n2(xdot, axd, c, A, beta, gamma):
+    """Euler kernel for n == 2: |z|^{n-1} z -> |z| z and |z|^n -> z z (no pow)."""
+    z = np.empty_like(xdot)
+    z[0] = 0.0
+    for i in range(1, xdot.size):
+        z_prev = z[i-1]
+        z[i] = z_prev + c*(A*xdot[i-1] - beta*axd[i-1]*abs(z_prev)*z_prev
+                           - gamma*xdot[i-1]*z_prev*z_prev)
+    return z
+
+@njit(fastmath=True, cache=True)
+def _integrate_boucwen_n1(xdot, axd, c, A, beta, gamma):
+    """Euler kernel for n == 1: |z|^{n-1} z -> z and |z|^n -> |z|."""
+    z = np.empty_like(xdot)
+    z[0] = 0.0
+    for i in range(1, xdot.size):
+        z_prev = z[i-1]
+        z[i] = z_prev + c*(A*xdot[i-1] - beta*axd[i-1]*z_prev
+                           - gamma*xdot[i-1]*abs(z_prev))
+    return z
+
+@njit(fastmath=True, cache=True)
+def _integrate_boucwen_pow(xdot, axd, c, A, beta, gamma, n):
+    """Euler kernel for general (non-integer) n via math.pow."""
+    z = np.empty_like(xdot)
+    z[0] = 0.0
+    for i in range(1, xdot.size):
+        z_prev = z[i-1]
+        absz = abs(z_prev)
+        z[i] = z_prev + c*(A*xdot[i-1] - beta*axd[i-1]*math.pow(absz, n - 1.0)*z_prev
+                           - gamma*xdot[i-1]*math.pow(absz, n))
+    return z
+
+def _integrate_boucwen(xdot, axd, c, A, beta, gamma, n):
+    """Forward-Euler integration of the Bouc–Wen state z(t) over a velocity trace.
+
+    axd is the precomputed |xdot| and c the step coefficient dt/tau_R. The
+    exponent is dispatched once here so the compiled loops never branch on n.
+    """
+    if n == 2:
+        return _integrate_boucwen_n2(xdot, axd, c, A, beta, gamma)
+    if n == 1:
+        return _integrate_boucwen_n1(xdot, axd, c, A, beta, gamma)
+    return _integrate_boucwen_pow(xdot, axd, c, A, beta, gamma, float(n))
+
+def _integrate_boucwen_ivp(t, x_amp, omega, tau_R, A, beta, gamma, n, method):
+    """Adaptive-step integration of z(t) with scipy's solve_ivp, sampled on t."""
+    from scipy.integrate import solve_ivp
+
+    inv_tau = 1.0 / max(1e-9, tau_R)
+    v_amp = omega*x_amp
+
+    def rhs(t_, z_):
+        # xdot is known analytically, so no interpolation of the velocity trace
+        xd = v_amp*math.cos(omega*t_)
+        return inv_tau * bouc_wen(xd, z_, A=A, beta=beta, gamma=gamma, n=n)
+
+    sol = solve_ivp(rhs, (t[0], t[-1]), [0.0], method=method, t_eval=t,
+                    rtol=1e-6, atol=1e-9)
+    if not sol.success:
+        raise RuntimeError(f"solve_ivp ({method}) failed: {sol.message}")
+    return sol.y[0]
+
+@njit(fastmath=True, cache=True)
+def _cavity_and_jet(x, xdot, z, k1, k2, A0, Cc, rho):
+    """Pressure p, volume change dV and instantaneous thrust, fused into one pass."""
+    p = np.empty_like(x)
+    dV = np.empty_like(x)
+    thrust_inst = np.empty_like(x)
+    rho_A0 = rho*A0
+    Cc_over_A0 = Cc/A0
+    for i in range(x.size):
+        xi = x[i]
+        p[i] = k1*xi + k2*z[i]
+        dV[i] = A0*xi
+        # outstroke mask as a branchless clamp: u_exit = 0 whenever xdot <= 0
+        u_exit = Cc_over_A0*max(xdot[i], 0.0)
+        thrust_inst[i] = rho_A0*u_exit*u_exit
+    return p, dV, thrust_inst
+
+@njit(fastmath=True, cache=True)
+def _loop_area(p, dV):
+    """Trapezoidal ∮ p dV (Green's-theorem form of the p–V loop area) in one pass."""
+    s = 0.0
+    for i in range(p.size - 1):
+        s += 0.5*(p[i] + p[i+1])*(dV[i+1] - dV[i])
+    return s
+
 def simulate_cycle(D=0.010, f=150.0, stroke_ratio=4.0, tau_R=2.0,
                    cavity_C=2.0e-8, # m^3/Pa effective compliance
                    rho=1.2, mu_air=1.8e-5,
                    A_bw=1.0, beta=0.6, gamma=0.2, n=2,
-                   duration_cycles=10, dt=1e-5, seed=417):
+                   duration_cycles=10, dt=1e-5, seed=417, method="euler"):
     """
     Simulate a few cycles of a synthetic jet with Bouc–Wen hysteresis
     in the pressure-volume relation of the cavity liner.
+    method: "euler" (fixed-step, compiled) or a scipy solve_ivp method such as
+    "LSODA" / "RK45" for adaptive stepping (LSODA also handles stiff, small tau_R).
     Returns: dict with time traces and summary metrics (impulse, loop area, etc.)
     """
     rng = np.random.default_rng(seed)
     T = 1.0/f
     duration = duration_cycles*T
-    t = np.arange(0.0, duration, dt)
+    # deterministic grid length (arange with a float step can give N±1 samples);
+    # integer arange * dt keeps the requested step exactly
+    n_steps = int(round(duration/dt))
+    if n_steps < 1:
+        raise ValueError(f"duration {duration:g} s is shorter than one step dt={dt:g} s")
+    t = np.arange(n_steps)*dt
 
     # stroke length L0 from S*D; map to diaphragm velocity amplitude U0 via half-cycle duration
     S = stroke_ratio
@@ -48,38 +169,36 @@ def simulate_cycle(D=0.010, f=150.0, stroke_ratio=4.0, tau_R=2.0,
     # Diaphragm displacement x(t) ~ sin; velocity xdot(t)
     # Choose amplitude so that volumetric flow ~ A_orifice * U_out on outstroke
     x_amp = (L0/2.0)  # diaphragm proxy amplitude
-    x = x_amp*np.sin(2*pi*f*t)
-    xdot = 2*pi*f*x_amp*np.cos(2*pi*f*t)
+    omega = 2*pi*f
+    x, xdot = _diaphragm_kinematics(omega*t, float(x_amp), float(omega))
 
     # Bouc–Wen hysteretic internal state z(t)
-    z = np.zeros_like(t)
-    for i in range(1, len(t)):
-        z[i] = z[i-1] + (bouc_wen(xdot[i-1], z[i-1], A=A_bw, beta=beta, gamma=gamma, n=n)
-                         * dt / max(1e-9, tau_R))  # scale by tau_R: larger tau_R -> slower decay (more memory)
+    if method == "euler":
+        # the recurrence is serial, so only the per-step abs() and tau_R clamp are hoisted
+        axd = np.abs(xdot)
+        c = dt / max(1e-9, tau_R)  # scale by tau_R: larger tau_R -> slower decay (more memory)
+        z = _integrate_boucwen(xdot, axd, float(c), float(A_bw), float(beta), float(gamma), n)
+    else:
+        z = _integrate_boucwen_ivp(t, x_amp, omega, tau_R, A_bw, beta, gamma, n, method)
 
     # Pressure model: p = k1 * x + k2 * z ; simple linear + hysteretic contribution
     k1 = 1.0 / max(1e-12, cavity_C)   # stiffness proxy
     k2 = 0.2 * k1                      # hysteretic weight
-    p = k1*x + k2*z
 
     # Volume change dV ~ A_diaphragm * x  (use orifice area proxy to keep simple)
     A0 = pi*(D/2.0)**2
-    dV = A0*x
+
+    # Jet model: outstroke only, taken as xdot>0; exit velocity u = Cc * xdot/A0
+    # (crude mapping: volumetric flow / area, Cc = nonlinear contraction factor)
+    # Thrust ~ rho * A * u^2 over outstroke
+    Cc = 0.8
+    p, dV, thrust_inst = _cavity_and_jet(x, xdot, z, float(k1), float(k2), float(A0),
+                                         Cc, float(rho))
 
     # Loop area in p–V plane (hysteresis integral) over final cycle
     idx0 = int(0.8*len(t))  # last 20% of time
-    A_loop = np.trapz(p[idx0:]*np.gradient(dV[idx0:], t[idx0:]), t[idx0:])
+    A_loop = _loop_area(p[idx0:], dV[idx0:])
 
-    # Jet model: outstroke only (xdot<0 or >0 depending on sign); map to exit velocity
-    # We'll take outstroke as xdot>0
-    out = xdot > 0
-    u = (xdot/A0) * out  # crude mapping: volumetric flow / area
-    # Nonlinear contraction factor
-    Cc = 0.8
-    u_exit = Cc * u
-
-    # Thrust ~ rho * A * u^2 over outstroke
-    thrust_inst = 1.0 * rho * A0 * (u_exit**2) * out
     impulse = np.trapz(thrust_inst, t)
 
     # Normalize impulse by formation efficiency and continuity gain
@@ -100,28 +219,33 @@ def sweep_S_tauR(D=0.010, f=150.0, S_vals=None, tau_vals=None,
         S_vals = np.linspace(1.0, 8.0, 40)
     if tau_vals is None:
         tau_vals = np.array([0.1, 0.5, 1.0, 2.0, 5.0])
-    S_vals = np.array(S_vals)
-    data = []
-    for tau_R in tau_vals:
-        H = tau_R/(tau_R + 0.5)
-        for S in S_vals:
-            eff = np.exp(-0.5*((S-4.0)/sigma)**2)
-            impulse = eff*(1.0 + k_H*H)
-            data.append((S, tau_R, impulse))
-    return np.array(data, float)
+    # rows ordered tau_R-major, S-minor: (S, tau_R, impulse)
+    S2, T2 = np.meshgrid(np.asarray(S_vals, float), np.asarray(tau_vals, float))
+    eff = np.exp(-0.5*((S2-4.0)/sigma)**2)
+    H = T2/(T2 + 0.5)
+    impulse = eff*(1.0 + k_H*H)
+    return np.column_stack([S2.ravel(), T2.ravel(), impulse.ravel()])
+
+@njit(fastmath=True, cache=True)
+def _fit_resid(params, S, tauR, I, tau0):
+    """Residual of the envelope x continuity-gain model against bench impulse."""
+    sigma = params[0]
+    kH = params[1]
+    out = np.empty_like(S)
+    for i in range(S.size):
+        u = (S[i] - 4.0)/sigma
+        out[i] = math.exp(-0.5*u*u)*(1.0 + kH*tauR[i]/(tauR[i] + tau0)) - I[i]
+    return out
 
 def fit_sigma_kH(bench_S, bench_tauR, bench_impulse, tau0=0.5, init=(1.0, 0.6)):
     """Least squares fit for sigma and k_H to match bench data (S sweep, τR gain)."""
     from scipy.optimize import least_squares
 
-    def resid(params):
-        sigma, kH = params
-        eff = np.exp(-0.5*((bench_S-4.0)/sigma)**2)
-        H = bench_tauR/(bench_tauR + tau0)
-        model = eff*(1.0 + kH*H)
-        return model - bench_impulse
-
-    res = least_squares(resid, x0=np.array(init), bounds=([0.2, 0.0],[5.0, 2.0]))
+    S = np.ascontiguousarray(bench_S, dtype=np.float64)
+    tauR = np.ascontiguousarray(bench_tauR, dtype=np.float64)
+    I = np.ascontiguousarray(bench_impulse, dtype=np.float64)
+    res = least_squares(_fit_resid, x0=np.array(init, float), bounds=([0.2, 0.0],[5.0, 2.0]),
+                        args=(S, tauR, I, float(tau0)))
     sigma_fit, kH_fit = res.x
     return sigma_fit, kH_fit, res.cost
 
@@ -134,14 +258,14 @@ def demo_plot():
     k_H = 0.6
     sigma = 1.0
     C_S = np.exp(-0.5*((S-4.0)/sigma)**2)
-    for tauR in tauR_values:
-        H = tauR/(tauR + tau0)
-        T_norm = C_S * (1.0 + k_H * H)
-        plt.plot(S, T_norm, label=f'τ_R={tauR:.1f}')
+    tauR = np.array(tauR_values)
+    H = tauR/(tauR + tau0)
+    T_norm = C_S[None, :] * (1.0 + k_H * H[:, None])  # one row per tau_R
+    plt.plot(S, T_norm.T)
     plt.xlabel('Stroke ratio S = L0/D')
     plt.ylabel('Normalized impulse (arb.)')
     plt.title('C-SJX model: impulse vs. S with continuity gain')
-    plt.legend()
+    plt.legend([f'τ_R={v:.1f}' for v in tauR_values])
     plt.tight_layout()
     plt.show()
 
@@ -0,0 +1,11 @@
+# gunicorn.conf.py
+# Prefork sync workers; /interpret and /generate are pure CPU with no shared state.
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2 * multiprocessing.cpu_count() + 1))
+worker_class = "sync"
+# Import the app once in the master so forked workers share its pages.
+preload_app = True
+keepalive = 5
@@ -1,13 +1,14 @@
 
 
 # weather_service.py
-from typing import Any, Optional
+import asyncio
+from typing import Any, AsyncIterator, Optional
 import logging
 import httpx
+import orjson
+from cachetools import TTLCache
 from mcp.server.fastmcp import FastMCP
-
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
@@ -17,27 +18,85 @@ USER_AGENT = "weather-app/1.0 (you@example.com)"
 logger = logging.getLogger("weather_service")
 logging.basicConfig(level=logging.INFO)
 
+# Shared client: keeps connections (and HTTP/2 streams) to api.weather.gov alive
+# across requests instead of paying a TCP+TLS handshake per call. It lives for the
+# whole process (FastMCP enters its lifespan once per session, so a per-session
+# hook must not close it) and is opened lazily on first use. It is never closed
+# explicitly: the OS reclaims its sockets when the process exits.
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide NWS client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "application/geo+json",
+            },
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _client
+
+
+# Initialize FastMCP server
+mcp = FastMCP("weather")
+
 
 async def make_nws_request(url: str) -> dict[str, Any] | None:
     """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json",
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, headers=headers, timeout=30.0)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as exc:
-            logger.warning("NWS returned non-2xx for %s: %s", url, exc)
-            return None
-        except httpx.RequestError as exc:
-            logger.exception("Network error while requesting %s", url)
-            return None
-        except ValueError:
-            logger.exception("Invalid JSON from %s", url)
-            return None
+    try:
+        resp = await get_client().get(url)
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as exc:
+        logger.warning("NWS returned non-2xx for %s: %s", url, exc)
+        return None
+    except httpx.RequestError as exc:
+        logger.exception("Network error while requesting %s", url)
+        return None
+    except ValueError:
+        logger.exception("Invalid JSON from %s", url)
+        return None
+
+
+# Point metadata is stable for minutes; cache it per rounded (lat, lon).
+_points_cache: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+# One in-flight fetch per key: concurrent misses all await the same task (its
+# failure included) instead of each going upstream.
+_points_inflight: dict[tuple[float, float], asyncio.Task] = {}
+
+
+async def _fetch_point_uncached(key: tuple[float, float], url: str) -> dict[str, Any] | None:
+    point = await make_nws_request(url)
+    if point is not None:  # only successful lookups are cached
+        _points_cache[key] = point
+    return point
+
+
+async def fetch_point(lat: float, lon: float, url: str) -> dict[str, Any] | None:
+    """Fetch NWS point metadata through the TTL cache (one upstream request per key)."""
+    key = (round(lat, 3), round(lon, 3))
+    point = _points_cache.get(key)
+    if point is not None:
+        return point
+    task = _points_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_point_uncached(key, url))
+        _points_inflight[key] = task
+
+        def _done(t: asyncio.Task, key: tuple[float, float] = key) -> None:
+            if _points_inflight.get(key) is t:
+                del _points_inflight[key]
+            if not t.cancelled():
+                t.exception()  # retrieved here in case every waiter was cancelled
+
+        task.add_done_callback(_done)
+    # shield: one caller going away must not cancel the fetch the others await
+    return await asyncio.shield(task)
 
 
 def format_alert(feature: dict) -> str:
@@ -52,6 +111,15 @@ def format_alert(feature: dict) -> str:
     )
 
 
+async def stream_json_object(fields: dict[str, Any]) -> AsyncIterator[bytes]:
+    """Yield a JSON object one top-level key at a time, each value serialized separately."""
+    yield b"{"
+    for i, (key, value) in enumerate(fields.items()):
+        yield (b"," if i else b"") + orjson.dumps(key) + b":"
+        yield orjson.dumps(value)
+    yield b"}"
+
+
 def validate_lat_lon(lat: float, lon: float) -> bool:
     return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
 
@@ -68,7 +136,9 @@ async def root() -> dict[str, Any]:
 
 
 @mcp.get("/weather")
-async def get_weather(lat: float, lon: float, hourly: Optional[bool] = False) -> dict[str, Any]:
+async def get_weather(
+    lat: float, lon: float, hourly: Optional[bool] = False
+) -> Response:
     """
     Fetch point metadata, forecast (or hourly forecast), and active alerts for a latitude/longitude.
 
@@ -79,34 +149,51 @@ async def get_weather(lat: float, lon: float, hourly: Optional[bool] = False) ->
     """
     # Basic validation
     if not validate_lat_lon(lat, lon):
-        return {"error": "invalid lat/lon; lat must be -90..90 and lon -180..180"}
+        return JSONResponse({"error": "invalid lat/lon; lat must be -90..90 and lon -180..180"})
 
-    # 1) Query points endpoint to get forecast URLs and metadata
+    # 1) Query points endpoint (forecast URLs, metadata) and active alerts concurrently;
+    #    alerts only need lat/lon, not the point response.
     point_url = f"{NWS_API_BASE}/points/{lat},{lon}"
-    logger.info("Fetching point metadata: %s", point_url)
-    point = await make_nws_request(point_url)
-    if point is None:
-        return {"error": "failed to fetch point metadata from NWS"}
-
-    props = point.get("properties", {})
-    # pick forecast url
-    forecast_url = props.get("forecastHourly") if hourly else props.get("forecast")
-    if not forecast_url:
-        # fallback: sometimes forecast is present only as forecast (non-hourly)
-        forecast_url = props.get("forecast") or props.get("forecastHourly")
-
-    # 2) Fetch forecast (if available)
-    forecast = None
-    if forecast_url:
-        logger.info("Fetching forecast: %s", forecast_url)
-        forecast = await make_nws_request(forecast_url)
-        if forecast is None:
-            logger.warning("Forecast lookup failed for %s", forecast_url)
-
-    # 3) Fetch active alerts for the point
     alerts_url = f"{NWS_API_BASE}/alerts/active?point={lat},{lon}"
+    logger.info("Fetching point metadata: %s", point_url)
+    point_task = asyncio.create_task(fetch_point(lat, lon, point_url))
     logger.info("Fetching alerts: %s", alerts_url)
-    alerts = await make_nws_request(alerts_url)
+    alerts_task = asyncio.create_task(make_nws_request(alerts_url))
+
+    forecast_task = None
+    try:
+        point = await point_task
+        if point is None:
+            return JSONResponse({"error": "failed to fetch point metadata from NWS"})
+
+        props = point.get("properties", {})
+        # pick forecast url
+        forecast_url = props.get("forecastHourly") if hourly else props.get("forecast")
+        if not forecast_url:
+            # fallback: sometimes forecast is present only as forecast (non-hourly)
+            forecast_url = props.get("forecast") or props.get("forecastHourly")
+
+        # 2) Fetch forecast (if available) while the alerts request finishes
+        forecast = None
+        if forecast_url:
+            logger.info("Fetching forecast: %s", forecast_url)
+            forecast_task = asyncio.create_task(make_nws_request(forecast_url))
+            forecast, alerts = await asyncio.gather(forecast_task, alerts_task)
+            if forecast is None:
+                logger.warning("Forecast lookup failed for %s", forecast_url)
+        else:
+            alerts = await alerts_task
+    finally:
+        # Never leave a fetch running (or its error unretrieved) when we bail out early.
+        for task in (point_task, alerts_task, forecast_task):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+
+    # 3) Format active alerts for the point
     formatted_alerts = []
     if alerts and isinstance(alerts.get("features"), list):
         formatted_alerts = [format_alert(f) for f in alerts["features"]]
@@ -117,8 +204,10 @@ async def get_weather(lat: float, lon: float, hourly: Optional[bool] = False) ->
     if rel_loc:
         location_name = rel_loc.get("properties", {}).get("city")
 
-    # Build response
-    return {
+    # Build response; each top-level value is serialized and sent on its own, so the
+    # combined JSON document is never concatenated in memory (the parsed NWS dicts
+    # themselves are already fully loaded).
+    fields = {
         "point_url": point_url,
         "point": props,          # full point properties (may be large)
         "location_name": location_name,
@@ -127,6 +216,7 @@ async def get_weather(lat: float, lon: float, hourly: Optional[bool] = False) ->
         "alerts_raw": alerts,    # raw alerts JSON
         "alerts_text": formatted_alerts,
     }
+    return StreamingResponse(stream_json_object(fields), media_type="application/json")
 
 # Optional: dedicated alerts endpoint if you want raw and formatted responses
 @mcp.get("/alerts")